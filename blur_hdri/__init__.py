@@ -1,10 +1,86 @@
 import bpy
-from bpy.props import FloatProperty
+from bpy.props import BoolProperty, FloatProperty
 from bpy.types import Operator
-from PIL import Image, ImageFilter
 import os
-import numpy as np
-import OpenEXR, Imath
+import json
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+# Heavy dependencies are imported on first use so add-on registration stays cheap
+np = Image = ImageFilter = OpenEXR = Imath = None
+ndimage = signal = cv2 = None
+_deps_loaded = False
+
+
+def _import_deps():
+    global np, Image, ImageFilter, OpenEXR, Imath, ndimage, signal, cv2, _deps_loaded
+    if _deps_loaded:
+        return
+
+    import numpy as np
+    from PIL import Image, ImageFilter
+    import OpenEXR, Imath
+
+    try:
+        from scipy import ndimage, signal
+    except ImportError:
+        pass
+
+    try:
+        import cv2
+    except ImportError:
+        pass
+
+    _deps_loaded = True
+
+
+# Shared pool for per-channel blurs, created on first use
+_executor = None
+
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=4)  # one per RGBA channel
+    return _executor
+
+
+# Small LRU of blur buffers reused across invocations, keyed by purpose, shape and dtype.
+# Channel jobs run on the pool, so access is locked, and the total size is capped.
+_buffer_cache = {}
+_buffer_lock = threading.Lock()
+_BUFFER_CACHE_BYTES = 256 * 1024 * 1024
+
+
+def _get_buffer(name, shape, dtype):
+    key = (name, tuple(shape), np.dtype(dtype).str)
+    with _buffer_lock:
+        buf = _buffer_cache.pop(key, None)
+        if buf is None:
+            buf = np.empty(shape, dtype=dtype)
+            # Evict the oldest buffers until the new one fits in the budget
+            while _buffer_cache and sum(b.nbytes for b in _buffer_cache.values()) + buf.nbytes > _BUFFER_CACHE_BYTES:
+                del _buffer_cache[next(iter(_buffer_cache))]
+        if buf.nbytes <= _BUFFER_CACHE_BYTES:
+            _buffer_cache[key] = buf
+    return buf
+
+
+@functools.lru_cache(maxsize=64)
+def _gauss_kernel(sigma, truncate=4.0):
+    # Normalized 1D Gaussian, by default with the same support as ndimage.gaussian_filter1d
+    support = int(truncate * sigma + 0.5)
+    x = np.arange(-support, support + 1, dtype=np.float32)
+    kernel = np.exp(-x ** 2 / (2 * sigma ** 2))
+    return kernel / kernel.sum()
+
+
+@functools.lru_cache(maxsize=8)
+def _gauss_kernel_2d(sigma):
+    # Outer product for the FFT path, shared by all channels
+    kernel = _gauss_kernel(sigma)
+    return np.outer(kernel, kernel)
 
 
 class NODE_OT_blur_env_image(Operator):
@@ -20,69 +96,84 @@ class NODE_OT_blur_env_image(Operator):
         max=100.0
     )
 
-    def execute(self, context):
-        # --- Get active node tree ---
-        node_tree = None
-        space = context.space_data
-        if space and hasattr(space, "node_tree") and space.node_tree:
-            node_tree = space.node_tree
-        elif context.object and context.object.active_material and context.object.active_material.use_nodes:
-            node_tree = context.object.active_material.node_tree
-        elif context.scene.world and context.scene.world.node_tree:
-            node_tree = context.scene.world.node_tree
-
-        if not node_tree:
-            self.report({'ERROR'}, "No node tree found (material or world).")
-            return {'CANCELLED'}
+    half_float: BoolProperty(
+        name="Half Float",
+        description="Save blurred EXR images as 16-bit half float",
+        default=True
+    )
 
-        nodes = node_tree.nodes
-        selected_nodes = [n for n in nodes if n.select]
-        if not selected_nodes:
-            self.report({'ERROR'}, "No node selected.")
-            return {'CANCELLED'}
+    # Set in invoke() so the dialog only offers EXR options for EXR images
+    is_exr: BoolProperty(default=False, options={'HIDDEN', 'SKIP_SAVE'})
 
-        node = selected_nodes[0]
-        if not (hasattr(node, "image") and node.image and node.image.filepath):
-            self.report({'ERROR'}, "Selected node is not an image node or has no image.")
+    def execute(self, context):
+        nodes, node, error = self.find_image_node(context)
+        if error:
+            self.report({'ERROR'}, error)
             return {'CANCELLED'}
 
         img_path = bpy.path.abspath(node.image.filepath)
         base, ext = os.path.splitext(img_path)
         blurred_path = base + "_blurred" + ext
+        is_env = node.bl_idname == 'ShaderNodeTexEnvironment'
+        cache_path = blurred_path + ".cache.json"
+        settings = {"radius": self.radius, "is_env": is_env}
+        if ext.lower() == ".exr":
+            settings["half_float"] = self.half_float
 
         try:
-            if ext.lower() == ".exr":
-                # --- Handle EXR ---
-                blurred_img = self.process_exr(img_path, self.radius, is_env=(node.bl_idname == 'ShaderNodeTexEnvironment'))
-
-                # Save EXR with RGBA
-                exr_file = OpenEXR.InputFile(img_path)
-                header = exr_file.header()
-                out_file = OpenEXR.OutputFile(blurred_path, header)
-                out_file.writePixels({
-                    'R': blurred_img[:, :, 0].astype(np.float32).tobytes(),
-                    'G': blurred_img[:, :, 1].astype(np.float32).tobytes(),
-                    'B': blurred_img[:, :, 2].astype(np.float32).tobytes(),
-                    'A': blurred_img[:, :, 3].astype(np.float32).tobytes(),
-                })
-                out_file.close()
+            _import_deps()
+            cached = self.cache_matches(img_path, blurred_path, cache_path, settings)
+            if not cached:
+                # Drop the old sidecar first so a failed write can never be reused
+                try:
+                    os.remove(cache_path)
+                except FileNotFoundError:
+                    pass
 
-                new_image = bpy.data.images.load(blurred_path)
+                if ext.lower() == ".exr":
+                    # --- Handle EXR ---
+                    channels, header = self.process_exr(img_path, self.radius, is_env=is_env, image=node.image)
+
+                    # Save EXR, reusing the input header with only the blurred channels
+                    pixel_type = Imath.PixelType(Imath.PixelType.HALF if self.half_float else Imath.PixelType.FLOAT)
+                    header['channels'] = {name: Imath.Channel(pixel_type) for name in channels}
+                    pixels = {}
+                    for name, plane in channels.items():
+                        assert plane.dtype == np.float32 and plane.flags.c_contiguous
+                        if self.half_float:
+                            # Keep bright highlights finite in fp16
+                            np.clip(plane, -65504.0, 65504.0, out=plane)
+                            plane = plane.astype(np.float16)
+                        pixels[name] = plane.tobytes()
+                    out_file = OpenEXR.OutputFile(blurred_path, header)
+                    out_file.writePixels(pixels)
+                    out_file.close()
 
-            else:
-                # --- Handle non-EXR (JPEG, PNG, etc.) ---
-                img = Image.open(img_path)
-                if node.bl_idname == 'ShaderNodeTexEnvironment':
-                    img = self.pad_and_blur(img, self.radius)
                 else:
-                    img = img.filter(ImageFilter.GaussianBlur(radius=self.radius))
-                img.save(blurred_path)
+                    # --- Handle non-EXR (JPEG, PNG, etc.) ---
+                    img = Image.open(img_path)
+                    # Palette and bilevel images would blur the raw indices, blur the colors instead
+                    if img.mode in ('1', 'P', 'PA'):
+                        img = img.convert('RGBA' if img.mode == 'PA' or 'transparency' in img.info else 'RGB')
+                    if cv2 is not None:
+                        img = self.cv2_blur(img, self.radius, is_env=is_env)
+                    else:
+                        # Pillow's extended box blur costs the same at any radius
+                        img = self.pil_blur(img, self.radius, is_env)
+                    img.save(blurred_path)
+
+                with open(cache_path, "w") as f:
+                    json.dump(settings, f)
                 new_image = bpy.data.images.load(blurred_path)
 
+            else:
+                # --- Reuse the blurred file from a previous run ---
+                new_image = bpy.data.images.load(blurred_path, check_existing=True)
+
             # --- Create new node ---
             if node.bl_idname == 'ShaderNodeTexImage':
                 new_node = nodes.new(type='ShaderNodeTexImage')
-            elif node.bl_idname == 'ShaderNodeTexEnvironment':
+            elif is_env:
                 new_node = nodes.new(type='ShaderNodeTexEnvironment')
             else:
                 self.report({'ERROR'}, "Unsupported node type.")
@@ -99,8 +190,46 @@ class NODE_OT_blur_env_image(Operator):
 
         return {'FINISHED'}
 
+    # --- Helper for finding the selected image node ---
+    def find_image_node(self, context):
+        # --- Get active node tree ---
+        node_tree = None
+        space = context.space_data
+        if space and hasattr(space, "node_tree") and space.node_tree:
+            node_tree = space.node_tree
+        elif context.object and context.object.active_material and context.object.active_material.use_nodes:
+            node_tree = context.object.active_material.node_tree
+        elif context.scene.world and context.scene.world.node_tree:
+            node_tree = context.scene.world.node_tree
+
+        if not node_tree:
+            return None, None, "No node tree found (material or world)."
+
+        nodes = node_tree.nodes
+        node = nodes.active
+        if node is None or not node.select:
+            # Fall back to scanning only when the active node is not selected
+            node = next((n for n in nodes if n.select), None)
+        if node is None:
+            return nodes, None, "No node selected."
+
+        if not (hasattr(node, "image") and node.image and node.image.filepath):
+            return nodes, node, "Selected node is not an image node or has no image."
+
+        return nodes, node, None
+
+    # --- Helper for skipping the blur when nothing changed ---
+    def cache_matches(self, img_path, blurred_path, cache_path, settings):
+        try:
+            if os.path.getmtime(blurred_path) <= os.path.getmtime(img_path):
+                return False
+            with open(cache_path) as f:
+                return json.load(f) == settings
+        except (OSError, ValueError):
+            return False
+
     # --- Helper for EXR processing ---
-    def process_exr(self, path, radius, is_env):
+    def process_exr(self, path, radius, is_env, image=None):
         exr_file = OpenEXR.InputFile(path)
         header = exr_file.header()
         dw = header['dataWindow']
@@ -108,53 +237,145 @@ class NODE_OT_blur_env_image(Operator):
         height = dw.max.y - dw.min.y + 1
         FLOAT = Imath.PixelType(Imath.PixelType.FLOAT)
 
-        # Read RGB channels
-        red = np.frombuffer(exr_file.channel('R', FLOAT), dtype=np.float32).reshape((height, width))
-        green = np.frombuffer(exr_file.channel('G', FLOAT), dtype=np.float32).reshape((height, width))
-        blue = np.frombuffer(exr_file.channel('B', FLOAT), dtype=np.float32).reshape((height, width))
+        names = ['R', 'G', 'B', 'A'] if "A" in header['channels'] else ['R', 'G', 'B']
+        img = self.loaded_pixels(image, width, height, len(names))
+        if img is None:
+            # Read all channels in one pass, blurring straight from the planar buffers
+            img = [np.frombuffer(data, dtype=np.float32).reshape((height, width))
+                   for data in exr_file.channels(names, FLOAT)]
 
-        # Check if alpha exists
-        if "A" in header['channels']:
-            alpha = np.frombuffer(exr_file.channel('A', FLOAT), dtype=np.float32).reshape((height, width))
-        else:
-            alpha = np.ones((height, width), dtype=np.float32)
+        # Channels are independent and scipy/OpenCV release the GIL, so blur them concurrently.
+        # Numba's parallel kernel is already multithreaded and must not be entered from several threads.
+        blur = lambda name, plane: self.blur_plane(plane, radius, is_env, name)
+        blurred = _get_executor().map(blur, names, img) if ndimage is not None else map(blur, names, img)
 
-        img = np.stack([red, green, blue, alpha], axis=2)
+        return dict(zip(names, blurred)), header
 
-        # Convert to 8-bit for Pillow
-        img_uint8 = np.clip(img, 0, 1) * 255
-        img_uint8 = img_uint8.astype(np.uint8)
+    # --- Helper for reusing pixels Blender has already decoded ---
+    def loaded_pixels(self, image, width, height, num_channels):
+        # Only when the float buffer is identical to the file contents
+        if not (image and image.has_data and image.is_float and not image.is_dirty):
+            return None
+        colorspace = image.colorspace_settings
+        if not (colorspace.is_data or colorspace.name == 'Linear Rec.709'):
+            return None
+        if tuple(image.size) != (width, height) or image.channels < num_channels:
+            return None
 
-        if is_env:
-            pad = int(radius * 2)
-            left = img_uint8[:, -pad:]
-            right = img_uint8[:, :pad]
-            img_uint8 = np.hstack([left, img_uint8, right])
+        buf = np.empty(width * height * image.channels, dtype=np.float32)
+        image.pixels.foreach_get(buf)
+        # Blender stores interleaved rows bottom-up, EXR wants top-down planes
+        pixels = buf.reshape((height, width, image.channels))[::-1]
+        return np.ascontiguousarray(pixels.transpose(2, 0, 1)[:num_channels])
 
-        # Blur with Pillow
-        pil_img = Image.fromarray(img_uint8)
-        blurred = pil_img.filter(ImageFilter.GaussianBlur(radius=radius))
-        blurred_np = np.array(blurred)
+    # --- Helper for blurring one float32 (H, W) plane ---
+    def blur_plane(self, plane, radius, is_env, name):
+        height, width = plane.shape
 
-        if is_env:
-            blurred_np = blurred_np[:, pad:-pad]
+        # Large radii: blur a downsampled copy and upsample, cutting the work by ~k^2
+        if cv2 is not None and radius > 8:
+            out = _get_buffer(name, (height, width), np.float32)
+            k = max(1, int(radius / 4))
+            # INTER_AREA already box-averages k x k pixels, so take its variance out of sigma
+            small_sigma = np.sqrt(radius ** 2 - (k ** 2 - 1) / 12) / k
+            small_size = (max(1, round(width / k)), max(1, round(height / k)))
+            small = cv2.resize(plane, small_size, dst=_get_buffer(name + "_small", small_size[::-1], np.float32),
+                               interpolation=cv2.INTER_AREA)
+            small_out = _get_buffer(name + "_small_blurred", small_size[::-1], np.float32) if ndimage is not None else None
+            small = self.gaussian_plane(small, small_sigma, is_env, out=small_out)
+            if is_env:
+                # Upsampling clamps at the edges, so give it one wrapped column per side and crop
+                scale = width / small_size[0]
+                offset = round(scale)
+                padded = cv2.copyMakeBorder(small, 0, 0, 1, 1, cv2.BORDER_WRAP)
+                up = cv2.resize(padded, None, fx=scale, fy=height / small_size[1], interpolation=cv2.INTER_LINEAR)
+                np.copyto(out, up[:height, offset:offset + width])
+                return out
+            return cv2.resize(small, (width, height), dst=out, interpolation=cv2.INTER_LINEAR)
 
-        # Convert back to float [0,1]
-        return blurred_np.astype(np.float32) / 255.0
+        # The Numba fallback allocates its own output
+        out = _get_buffer(name, (height, width), np.float32) if ndimage is not None else None
+        return self.gaussian_plane(plane, radius, is_env, out=out)
+
+    # --- Helper for separable float32 Gaussian of one (H, W) plane ---
+    def gaussian_plane(self, plane, sigma, is_env, out=None):
+        kernel = _gauss_kernel(sigma)
+        support = len(kernel) // 2
+
+        # Huge kernels: a single FFT convolution beats the separable passes
+        if signal is not None and len(kernel) > 70:
+            blurred = signal.fftconvolve(self.pad_plane(plane, support, is_env), _gauss_kernel_2d(sigma), mode='valid')
+            if out is None:
+                return np.ascontiguousarray(blurred, dtype=np.float32)
+            np.copyto(out, blurred, casting='same_kind')
+            return out
+
+        # Wrap horizontally for env maps
+        if ndimage is not None:
+            blurred = ndimage.correlate1d(plane, kernel, axis=1, mode='wrap' if is_env else 'reflect', output=out)
+            ndimage.correlate1d(blurred, kernel, axis=0, mode='reflect', output=blurred)
+            return blurred
+
+        try:
+            from . import _blur_numba
+        except ImportError:
+            # Neither scipy nor numba is installed, fall back to numpy's FFT
+            padded = self.pad_plane(plane, support, is_env)
+            spectrum = np.fft.rfft2(padded) * np.fft.rfft2(_gauss_kernel_2d(sigma), s=padded.shape)
+            blurred = np.fft.irfft2(spectrum, s=padded.shape)
+            # The circular convolution is exact past the first 2 * support rows and columns
+            return np.ascontiguousarray(blurred[2 * support:, 2 * support:], dtype=np.float32)
+        return _blur_numba.sep_gauss_f32(plane, kernel, is_env)
 
-    # --- Helper for non-EXR env textures ---
-    def pad_and_blur(self, img, radius):
+    # --- Helper for baking the blur borders into a plane ---
+    def pad_plane(self, plane, support, is_env):
+        # Reflect vertically, wrap horizontally for env maps, so only the 'valid' part is kept
+        padded = np.pad(plane, ((support, support), (0, 0)), mode='symmetric')
+        return np.pad(padded, ((0, 0), (support, support)), mode='wrap' if is_env else 'symmetric')
+
+    # --- Helper for non-EXR blur with Pillow only ---
+    def pil_blur(self, img, radius, is_env):
+        blur = ImageFilter.GaussianBlur(radius=radius)
+        if not is_env:
+            return img.filter(blur)
+
+        # Wrap the columns so the seam blurs across, then crop back
         arr = np.array(img)
-        pad = int(radius * 2)
-        left = arr[:, -pad:]
-        right = arr[:, :pad]
-        arr = np.hstack([left, arr, right])
-        pil_img = Image.fromarray(arr)
-        blurred = pil_img.filter(ImageFilter.GaussianBlur(radius=radius))
-        blurred_arr = np.array(blurred)[:, pad:-pad]
-        return Image.fromarray(blurred_arr)
+        pad = int(radius * 3) + 1
+        padded = np.pad(arr, ((0, 0), (pad, pad)) + ((0, 0),) * (arr.ndim - 2), mode='wrap')
+        # Rebuild with the source mode, fromarray would read e.g. CMYK as RGBA
+        padded_img = Image.frombytes(img.mode, (padded.shape[1], padded.shape[0]), padded.tobytes())
+        blurred = np.array(padded_img.filter(blur))
+        return Image.frombytes(img.mode, img.size, blurred[:, pad:pad + arr.shape[1]].tobytes())
+
+    # --- Helper for non-EXR blur with OpenCV ---
+    def cv2_blur(self, img, radius, is_env):
+        arr = np.array(img)
+        kernel = _gauss_kernel(radius, truncate=3.0)
+        ksize = len(kernel)
+
+        # sepFilter2D does not accept BORDER_WRAP, so wrap the columns explicitly
+        if is_env:
+            pad = ksize // 2
+            arr = cv2.copyMakeBorder(arr, 0, 0, pad, pad, cv2.BORDER_WRAP)
+
+        out = _get_buffer("cv2", arr.shape, arr.dtype)
+        blurred = cv2.sepFilter2D(arr, -1, kernel, kernel, dst=out, borderType=cv2.BORDER_REFLECT)
+
+        if is_env and pad:
+            blurred = blurred[:, pad:-pad]
+        # Rebuild with the source mode, fromarray would read e.g. CMYK as RGBA
+        return Image.frombytes(img.mode, img.size, blurred.tobytes())
+
+    def draw(self, context):
+        layout = self.layout
+        layout.prop(self, "radius")
+        if self.is_exr:
+            layout.prop(self, "half_float")
 
     def invoke(self, context, event):
+        _, node, error = self.find_image_node(context)
+        self.is_exr = not error and os.path.splitext(node.image.filepath)[1].lower() == ".exr"
         return context.window_manager.invoke_props_dialog(self)
 
 
@@ -163,4 +384,9 @@ def register():
 
 
 def unregister():
-    bpy.utils.unregister_class(NODE_OT_blur_env_image)
\ No newline at end of file
+    global _executor
+    bpy.utils.unregister_class(NODE_OT_blur_env_image)
+    _buffer_cache.clear()
+    if _executor is not None:
+        _executor.shutdown(wait=False)
+        _executor = None
\ No newline at end of file
@@ -0,0 +1,43 @@
+import numpy as np
+from numba import njit, prange
+
+
+# --- Fallback separable Gaussian for bundles without scipy ---
+# numba is not bundled with the extension, this module is only used when it was installed by hand
+@njit(cache=True)
+def _reflect(i, n):
+    # Half-sample symmetric border, matches ndimage mode='reflect'
+    i %= 2 * n
+    if i >= n:
+        i = 2 * n - 1 - i
+    return i
+
+
+@njit(parallel=True, fastmath=True, cache=True)
+def sep_gauss_f32(img, kernel, wrap_x):
+    height, width = img.shape
+    r = kernel.shape[0] // 2
+    # Input may be a read-only view of the EXR buffer
+    tmp = np.empty((height, width), dtype=np.float32)
+    out = np.empty((height, width), dtype=np.float32)
+
+    # Horizontal pass, wrapping around for environment maps
+    for y in prange(height):
+        for x in range(width):
+            acc = np.float32(0.0)
+            for k in range(-r, r + 1):
+                xx = (x + k) % width if wrap_x else _reflect(x + k, width)
+                acc += kernel[k + r] * img[y, xx]
+            tmp[y, x] = acc
+
+    # Vertical pass, accumulating whole source rows so every read is contiguous
+    for y in prange(height):
+        for x in range(width):
+            out[y, x] = 0.0
+        for k in range(-r, r + 1):
+            src = _reflect(y + k, height)
+            weight = kernel[k + r]
+            for x in range(width):
+                out[y, x] += weight * tmp[src, x]
+
+    return out
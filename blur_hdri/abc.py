@@ -2,11 +2,10 @@ import OpenEXR
 import Imath
 import numpy as np
 import matplotlib.pyplot as plt
-from PIL import Image, ImageFilter
+from scipy import ndimage
 
 # --- Parameters ---
 blur_radius = 15  # controls blur kernel size
-padding_size = blur_radius * 2  # padding size is twice the blur radius
 
 # --- Load EXR ---
 exr_file = OpenEXR.InputFile("neon_photostudio_2k.exr")
@@ -16,35 +15,13 @@ width = dw.max.x - dw.min.x + 1
 height = dw.max.y - dw.min.y + 1
 
 FLOAT = Imath.PixelType(Imath.PixelType.FLOAT)
-red_str = exr_file.channel('R', FLOAT)
-green_str = exr_file.channel('G', FLOAT)
-blue_str = exr_file.channel('B', FLOAT)
+img = np.empty((height, width, 3), dtype=np.float32)
+for i, channel_str in enumerate(exr_file.channels(['R', 'G', 'B'], FLOAT)):
+    img[:, :, i] = np.frombuffer(channel_str, dtype=np.float32).reshape((height, width))
 
-red = np.frombuffer(red_str, dtype=np.float32).reshape((height, width))
-green = np.frombuffer(green_str, dtype=np.float32).reshape((height, width))
-blue = np.frombuffer(blue_str, dtype=np.float32).reshape((height, width))
-
-img = np.stack([red, green, blue], axis=2)
-
-# --- Normalize to 8-bit for Pillow ---
-img_normalized = np.clip(img, 0, 1) * 255
-img_uint8 = img_normalized.astype(np.uint8)
-
-# --- Circular wrap-around padding (no mirroring) ---
-left_pad = img_uint8[:, -padding_size:]   # copy from right edge
-right_pad = img_uint8[:, :padding_size]   # copy from left edge
-img_padded = np.hstack([left_pad, img_uint8, right_pad])
-
-# --- Blur padded image ---
-img_padded_pil = Image.fromarray(img_padded)
-blurred_padded = img_padded_pil.filter(ImageFilter.GaussianBlur(radius=blur_radius))
-
-# --- Crop back to original size ---
-blurred_padded_np = np.array(blurred_padded)
-blurred_cropped = blurred_padded_np[:, padding_size:-padding_size]
-
-# --- Back to float for saving EXR ---
-blurred_img = blurred_cropped.astype(np.float32) / 255.0
+# --- Separable Gaussian blur in float32 (circular wrap horizontally, no mirroring) ---
+blurred_img = ndimage.gaussian_filter1d(img, sigma=blur_radius, axis=1, mode='wrap')
+ndimage.gaussian_filter1d(blurred_img, sigma=blur_radius, axis=0, mode='reflect', output=blurred_img)
 
 # Save blurred image as EXR
 blurred_red = blurred_img[:, :, 0]
@@ -6,9 +6,12 @@
 
 import glob
 import os
+import shutil
 import subprocess
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
+from pathlib import Path
 from typing import List, Union
 import bpy
 
@@ -23,6 +26,7 @@ required_packages = [
     "Pillow",
     "OpenEXR",
     "numpy<2.0",
+    "scipy",
     # Add any other required packages here
 ]
 
@@ -91,10 +95,23 @@ def download_whls(
     if clean:
         remove_whls()
 
-    for platform in platforms:
+    # Each platform downloads into its own folder so parallel pip runs don't collide
+    def download(platform: Platform) -> str:
+        dest = os.path.join(WHL_PATH, platform.metadata)
         run_python(
-            f"-m pip download {' '.join(required_packages)} --dest {WHL_PATH} --only-binary=:all: --python-version={python_version} --platform={platform.pypi_suffix}"
+            ["-m", "pip", "download", *required_packages, "--dest", dest, "--only-binary=:all:",
+             f"--python-version={python_version}", f"--platform={platform.pypi_suffix}"]
         )
+        return dest
+
+    with ThreadPoolExecutor(max_workers=len(platforms)) as executor:
+        dests = list(executor.map(download, platforms))
+
+    # Merge back into WHL_PATH, pure-python wheels may show up in several folders
+    for dest in dests:
+        for whl_file in glob.glob(os.path.join(dest, "*.whl")):
+            os.replace(whl_file, os.path.join(WHL_PATH, os.path.basename(whl_file)))
+        shutil.rmtree(dest)
 
 
 def update_toml_whls(platforms):
@@ -148,9 +165,12 @@ def update_toml_whls(platforms):
 
 
 def clean_files(suffix: str = ".blend1") -> None:
-    pattern_to_remove = f"./**/*{suffix}"
-    for blend1_file in glob.glob(pattern_to_remove, recursive=True):
-        os.remove(blend1_file)
+    # Only the add-on folder ends up in the extension, no need to walk the whole repo
+    for blend1_file in Path(ADDON_NAME).rglob(f"*{suffix}"):
+        try:
+            blend1_file.unlink()
+        except FileNotFoundError:
+            pass
 
 
 def build_extension(split: bool = True) -> None: